@@ -134,6 +134,19 @@ function getGradesSummary(semester = '') {
     return apiRequest(endpoint);
 }
 
+// 首页聚合API：fields 如 ['enrollments', 'deadlines']，为空时返回全部部分
+function getDashboard(fields = [], semester = '') {
+    const params = new URLSearchParams();
+    if (fields.length) {
+        params.set('fields', fields.join(','));
+    }
+    if (semester) {
+        params.set('semester', semester);
+    }
+    const query = params.toString();
+    return apiRequest(query ? `/me/dashboard?${query}` : '/me/dashboard');
+}
+
 function getCourseGrades(enrollmentId) {
     return apiRequest(`/me/enrollments/${enrollmentId}/grades`);
 }
\ No newline at end of file
@@ -695,11 +695,73 @@ document.addEventListener('DOMContentLoaded', function() {
             // 忽略解析错误
         }
 
+        // 选课、近期截止、最新资料和 GPA 由首页聚合接口一次返回
+        loadHomeDashboard();
         // 加载首页展示的新课程列表
         loadHomeCourses();
     }
 });
 
+// 首页：一次请求加载选课统计、近期截止作业、最新资料和 GPA
+async function loadHomeDashboard() {
+    const data = await getDashboard(['enrollments', 'deadlines', 'materials', 'gpa']);
+    if (!data) return;
+
+    const enrollments = data.enrollments || [];
+    const countEl = document.getElementById('homeEnrollmentCount');
+    if (countEl) countEl.textContent = enrollments.length;
+
+    // 各学期课程按学分加权计算总 GPA
+    let totalCredits = 0;
+    let totalPoints = 0;
+    Object.values(data.gpa || {}).forEach(info => {
+        info.courses.forEach(course => {
+            totalCredits += course.credits;
+            totalPoints += course.gpa * course.credits;
+        });
+    });
+    const gpaEl = document.getElementById('homeGpaValue');
+    if (gpaEl) gpaEl.textContent = totalCredits > 0 ? (totalPoints / totalCredits).toFixed(2) : '0.00';
+    const creditsEl = document.getElementById('homeTotalCredits');
+    if (creditsEl) creditsEl.textContent = totalCredits;
+
+    const statusText = { todo: '未提交', submitted: '已提交', graded: '已批改' };
+    const deadlineList = document.getElementById('homeDeadlineList');
+    if (deadlineList) {
+        const deadlines = data.deadlines || [];
+        deadlineList.innerHTML = deadlines.length === 0 ? '<p>近期没有需要提交的作业。</p>' : '';
+        deadlines.forEach(item => {
+            const card = document.createElement('div');
+            card.className = 'course-card';
+            card.innerHTML = `
+                <h3>${item.title}</h3>
+                <p class="course-info">课程：${item.course_name}</p>
+                <p class="course-info">截止：${new Date(item.deadline).toLocaleString()}</p>
+                <p class="course-info">状态：${statusText[item.status] || item.status}</p>
+            `;
+            card.onclick = () => viewCourseDetail(item.enrollment_id);
+            deadlineList.appendChild(card);
+        });
+    }
+
+    const materialList = document.getElementById('homeMaterialList');
+    if (materialList) {
+        const materials = data.materials || [];
+        materialList.innerHTML = materials.length === 0 ? '<p>暂时没有新的学习资料。</p>' : '';
+        materials.forEach(item => {
+            const card = document.createElement('div');
+            card.className = 'course-card';
+            card.innerHTML = `
+                <h3>${item.title}</h3>
+                <p class="course-info">课程：${item.course_name}</p>
+                <p class="course-info">上传者：${item.uploader_name || '未知'}</p>
+            `;
+            card.onclick = () => viewCourseDetail(item.enrollment_id);
+            materialList.appendChild(card);
+        });
+    }
+}
+
 // 首页：加载最新课程
 async function loadHomeCourses() {
     const list = document.getElementById('homeCourseList');
@@ -1,48 +1,10 @@
 // 备份恢复页面专用JavaScript
 
-// 模拟备份数据
-let backupHistory = [
-    {
-        id: 1,
-        timestamp: '2025-12-20T02:00:00Z',
-        type: 'full',
-        size: '350MB',
-        status: 'completed',
-        note: '自动完整备份'
-    },
-    {
-        id: 2,
-        timestamp: '2025-12-19T14:30:00Z',
-        type: 'incremental',
-        size: '15MB',
-        status: 'completed',
-        note: '手动增量备份'
-    },
-    {
-        id: 3,
-        timestamp: '2025-12-18T02:00:00Z',
-        type: 'full',
-        size: '345MB',
-        status: 'completed',
-        note: '自动完整备份'
-    },
-    {
-        id: 4,
-        timestamp: '2025-12-17T10:15:00Z',
-        type: 'incremental',
-        size: '12MB',
-        status: 'failed',
-        note: '备份失败：存储空间不足'
-    },
-    {
-        id: 5,
-        timestamp: '2025-12-16T02:00:00Z',
-        type: 'full',
-        size: '340MB',
-        status: 'completed',
-        note: '自动完整备份'
-    }
-];
+// 后端 API 基地址
+const apiBase = 'http://127.0.0.1:8000/api/v1';
+
+// 备份记录（从后端加载）
+let backupHistory = [];
 
 // DOM加载完成后执行
 document.addEventListener('DOMContentLoaded', function() {
@@ -58,7 +20,7 @@ document.addEventListener('DOMContentLoaded', function() {
     document.getElementById('restore-confirm-text').addEventListener('input', checkRestoreConfirmation);
     
     // 初始化页面
-    loadBackupHistory();
+    fetchBackupHistory();
     updateStorageInfo();
     updateBackupTimer();
     setupTabSwitching();
@@ -90,6 +52,31 @@ function setupTabSwitching() {
     });
 }
 
+// 从后端加载备份记录
+async function fetchBackupHistory() {
+    try {
+        const response = await fetch(`${apiBase}/system/backups`, {
+            headers: {
+                'Authorization': `Bearer ${localStorage.getItem('token')}`
+            }
+        });
+        if (response.ok) {
+            const data = await response.json();
+            backupHistory = data.backups.map(backup => ({
+                id: backup.task_id,
+                timestamp: backup.started_at,
+                type: backup.type,
+                size: `${(backup.bytes / (1024 * 1024)).toFixed(1)}MB`,
+                status: backup.status,
+                note: backup.error ? `备份失败：${backup.error}` : (backup.note || (backup.type === 'full' ? '完整备份' : '增量备份'))
+            }));
+        }
+    } catch (error) {
+        console.error('加载备份记录失败:', error);
+    }
+    loadBackupHistory();
+}
+
 // 加载备份历史
 function loadBackupHistory() {
     const tableBody = document.getElementById('backupHistoryBody');
@@ -127,7 +114,7 @@ function loadBackupHistory() {
         const typeText = backup.type === 'full' ? '完整备份' : '增量备份';
         
         // 计算总大小
-        const sizeMB = parseInt(backup.size) || 0;
+        const sizeMB = parseFloat(backup.size) || 0;
         totalSize += sizeMB;
         
         // 统计成功数
@@ -155,13 +142,13 @@ function loadBackupHistory() {
                 <td><span class="status-badge ${statusClass}">${statusText}</span></td>
                 <td>
                     <div class="action-buttons">
-                        <button class="btn-icon" onclick="restoreFromBackup(${backup.id})" title="从此备份恢复">
+                        <button class="btn-icon" onclick="restoreFromBackup('${backup.id}')" title="从此备份恢复">
                             <i class="fas fa-undo"></i>
                         </button>
-                        <button class="btn-icon" onclick="downloadBackup(${backup.id})" title="下载备份">
+                        <button class="btn-icon" onclick="downloadBackup('${backup.id}')" title="下载备份">
                             <i class="fas fa-download"></i>
                         </button>
-                        <button class="btn-icon" onclick="deleteBackup(${backup.id})" title="删除备份">
+                        <button class="btn-icon" onclick="deleteBackup('${backup.id}')" title="删除备份">
                             <i class="fas fa-trash-alt"></i>
                         </button>
                     </div>
@@ -174,7 +161,7 @@ function loadBackupHistory() {
     
     // 更新统计信息
     document.getElementById('total-backups').textContent = backupHistory.length;
-    document.getElementById('total-backup-size').textContent = `${totalSize} MB`;
+    document.getElementById('total-backup-size').textContent = `${totalSize.toFixed(1)} MB`;
     document.getElementById('latest-backup').textContent = latestBackup ? 
         new Date(latestBackup.timestamp).toLocaleDateString('zh-CN') : '无';
     document.getElementById('backup-success-rate').textContent = 
@@ -234,30 +221,33 @@ function createBackup() {
 
 // 创建完整备份
 async function createFullBackup() {
-    await triggerBackendBackup();
-    showBackupProgress('full');
+    const taskId = await triggerBackendBackup('full');
+    if (taskId) showBackupProgress('full', taskId);
 }
 
 // 创建增量备份
 async function createIncrementalBackup() {
-    await triggerBackendBackup();
-    showBackupProgress('incremental');
+    const taskId = await triggerBackendBackup('incremental');
+    if (taskId) showBackupProgress('incremental', taskId);
 }
 
-// 实际调用后端备份接口（与系统管理首页保持一致）
-async function triggerBackendBackup() {
-    const apiBase = 'http://127.0.0.1:8000/api/v1';
+// 实际调用后端备份接口，成功时返回任务ID
+async function triggerBackendBackup(type) {
     try {
         const response = await fetch(`${apiBase}/system/backups`, {
             method: 'POST',
             headers: {
-                'Authorization': `Bearer ${localStorage.getItem('token')}`
-            }
+                'Authorization': `Bearer ${localStorage.getItem('token')}`,
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ type: type })
         });
         if (response.ok) {
             const result = await response.json();
-            alert(`备份任务已启动，任务ID: ${result.task_id}`);
             document.getElementById('backup-status-indicator')?.classList.add('online');
+            return result.task_id;
+        } else if (response.status === 409) {
+            alert('已有备份任务正在进行，请稍后再试。');
         } else {
             alert('创建备份失败，请稍后重试。');
         }
@@ -265,10 +255,11 @@ async function triggerBackendBackup() {
         console.error('调用备份接口失败:', error);
         alert('创建备份时发生错误，请检查网络连接。');
     }
+    return null;
 }
 
-// 显示备份进度
-function showBackupProgress(type) {
+// 显示备份进度（轮询后端任务状态）
+function showBackupProgress(type, taskId) {
     const container = document.getElementById('backup-progress-container');
     const progressFill = document.getElementById('backup-progress-fill');
     const statusText = document.getElementById('backup-status-text');
@@ -279,50 +270,44 @@ function showBackupProgress(type) {
     statusText.textContent = type === 'full' ? '正在准备完整备份...' : '正在准备增量备份...';
     progressText.textContent = '0%';
     
-    // 模拟备份过程
-    let progress = 0;
-    const interval = setInterval(() => {
-        progress += Math.random() * 10;
-        if (progress > 100) progress = 100;
+    const interval = setInterval(async () => {
+        let task;
+        try {
+            const response = await fetch(`${apiBase}/system/backups/${taskId}`, {
+                headers: {
+                    'Authorization': `Bearer ${localStorage.getItem('token')}`
+                }
+            });
+            if (!response.ok) return;
+            task = await response.json();
+        } catch (error) {
+            console.error('查询备份进度失败:', error);
+            return;
+        }
         
-        progressFill.style.width = `${progress}%`;
-        progressText.textContent = `${Math.round(progress)}%`;
+        progressFill.style.width = `${task.progress}%`;
+        progressText.textContent = `${Math.round(task.progress)}%`;
         
-        if (progress < 30) {
-            statusText.textContent = '正在备份用户数据...';
-        } else if (progress < 60) {
-            statusText.textContent = '正在备份课程数据...';
-        } else if (progress < 90) {
-            statusText.textContent = '正在备份成绩数据...';
-        } else {
-            statusText.textContent = '正在压缩和保存备份文件...';
+        if (task.status === 'running' && task.current_table) {
+            statusText.textContent = `正在备份 ${task.current_table}（${task.tables_done}/${task.tables_total} 张表，${Math.round(task.rows_per_sec)} 行/秒）`;
         }
         
-        if (progress >= 100) {
+        if (task.status === 'completed' || task.status === 'failed') {
             clearInterval(interval);
-            statusText.textContent = '备份完成！';
-            
-            // 添加新的备份记录
-            const newBackup = {
-                id: backupHistory.length + 1,
-                timestamp: new Date().toISOString(),
-                type: type,
-                size: type === 'full' ? `${Math.floor(Math.random() * 50) + 320}MB` : `${Math.floor(Math.random() * 20) + 5}MB`,
-                status: 'completed',
-                note: type === 'full' ? '手动完整备份' : '手动增量备份'
-            };
-            
-            backupHistory.unshift(newBackup);
-            loadBackupHistory();
-            updateStorageInfo();
+            statusText.textContent = task.status === 'completed' ? '备份完成！' : `备份失败：${task.error}`;
+            fetchBackupHistory();
             
             // 5秒后隐藏进度条
             setTimeout(() => {
                 container.style.display = 'none';
-                showMessage(`${type === 'full' ? '完整' : '增量'}备份创建成功！`, 'success');
+                if (task.status === 'completed') {
+                    showMessage(`${task.type === 'full' ? '完整' : '增量'}备份创建成功！`, 'success');
+                } else {
+                    showMessage('备份失败，请查看备份记录', 'error');
+                }
             }, 5000);
         }
-    }, 200);
+    }, 1000);
 }
 
 // 切换恢复选项
@@ -691,10 +676,9 @@ function refreshBackupList() {
     // 模拟刷新数据
     showMessage('正在刷新备份列表...', 'info');
     
-    setTimeout(() => {
-        loadBackupHistory();
+    fetchBackupHistory().then(() => {
         showMessage('备份列表已刷新', 'success');
-    }, 1000);
+    });
 }
 
 // 从主页面脚本复制公共函数
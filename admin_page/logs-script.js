@@ -138,28 +138,32 @@ async function loadLogsData() {
 // 加载日志统计
 async function loadLogsStats() {
     try {
-        // 获取总日志数
-        const totalResponse = await fetch(`${apiBase}/logs?pageSize=1`, {
+        // 统计数据来自后端的按天汇总表，不再为了取总数去查询日志列表
+        const statsResponse = await fetch(`${apiBase}/logs/stats`, {
             headers: {
                 'Authorization': `Bearer ${localStorage.getItem('token')}`
             }
         });
         
-        if (totalResponse.ok) {
-            const totalData = await totalResponse.json();
-            document.getElementById('totalLogsCount').textContent = totalData.pagination.totalItems.toLocaleString();
-            document.getElementById('total-logs-sidebar').textContent = totalData.pagination.totalItems.toLocaleString();
+        if (statsResponse.ok) {
+            const stats = await statsResponse.json();
+            document.getElementById('totalLogsCount').textContent = stats.total.toLocaleString();
+            document.getElementById('total-logs-sidebar').textContent = stats.total.toLocaleString();
+            document.getElementById('today-logs-sidebar').textContent = stats.today.toLocaleString();
+            
+            // 按操作类型归类（统计范围为最近30天）
+            const counts = { success: 0, failure: 0, security: 0 };
+            stats.by_action.forEach(item => {
+                const statusClass = getStatusClass(item.action);
+                if (statusClass in counts) {
+                    counts[statusClass] += item.count;
+                }
+            });
+            document.getElementById('successLogsCount').textContent = counts.success.toLocaleString();
+            document.getElementById('failureLogsCount').textContent = counts.failure.toLocaleString();
+            document.getElementById('securityLogsCount').textContent = counts.security.toLocaleString();
         }
         
-        // 获取今日日志数（模拟数据）
-        const todayLogs = Math.floor(Math.random() * 100) + 50;
-        document.getElementById('today-logs-sidebar').textContent = todayLogs;
-        
-        // 模拟其他统计数据
-        document.getElementById('successLogsCount').textContent = Math.floor(totalItems * 0.85).toLocaleString();
-        document.getElementById('failureLogsCount').textContent = Math.floor(totalItems * 0.10).toLocaleString();
-        document.getElementById('securityLogsCount').textContent = Math.floor(totalItems * 0.05).toLocaleString();
-        
     } catch (error) {
         console.error('加载日志统计失败:', error);
     }
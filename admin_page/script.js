@@ -49,16 +49,16 @@ async function loadDashboardData() {
         const token = localStorage.getItem('token');
         if (!token) return;
 
-        const logsResponse = await fetch(`${apiBase}/logs?pageSize=1`, {
+        const statsResponse = await fetch(`${apiBase}/logs/stats?days=1`, {
             headers: {
                 'Authorization': `Bearer ${token}`
             }
         });
 
-        if (!logsResponse.ok) return;
+        if (!statsResponse.ok) return;
 
-        const logsData = await logsResponse.json();
-        const totalLogs = logsData.pagination?.totalItems || 0;
+        const stats = await statsResponse.json();
+        const totalLogs = stats.today || 0;
 
         const todayLogsEl = document.getElementById('today-logs');
         const logCountEl = document.getElementById('log-count');
@@ -124,6 +124,37 @@ function showSystemStatus() {
     
     // 显示模态框
     document.getElementById('system-status-modal').style.display = 'flex';
+    
+    loadRouteMetrics();
+}
+
+// 用后端接口指标填充查询速度与数据库连接数
+async function loadRouteMetrics() {
+    const headers = { 'Authorization': `Bearer ${localStorage.getItem('token')}` };
+    try {
+        const metricsResponse = await fetch(`${apiBase}/system/metrics`, { headers });
+        if (metricsResponse.ok) {
+            const metrics = await metricsResponse.json();
+            const requests = metrics.routes.reduce((sum, r) => sum + r.requests, 0);
+            const totalMs = metrics.routes.reduce((sum, r) => sum + r.total_time_s * 1000, 0);
+            if (requests > 0) {
+                // routes 已按总耗时倒序排列
+                const slowest = metrics.routes[0];
+                document.getElementById('query-speed').textContent =
+                    `平均 ${Math.round(totalMs / requests)}ms（耗时最多：${slowest.method} ${slowest.route}，平均 ${slowest.sql_avg} 条SQL）`;
+            }
+        }
+        
+        const poolResponse = await fetch(`${apiBase}/system/db-pool/stats`, { headers });
+        if (poolResponse.ok) {
+            const pool = await poolResponse.json();
+            if (pool.size !== undefined) {
+                document.getElementById('db-connections').textContent = `${pool.checkedout}/${pool.size + Math.max(pool.overflow, 0)}`;
+            }
+        }
+    } catch (error) {
+        console.error('加载接口指标失败:', error);
+    }
 }
 
 // 关闭模态框
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+端到端基准测试
+
+在 SQLite 或 MySQL 中批量生成接近全校规模的合成数据，再用并发客户端按学生、教师、
+教学管理员、系统管理员的典型操作路径访问接口，按接口统计 p50/p95/p99 延迟与吞吐量，
+结果保存为 JSON，便于不同提交之间对比。在 backend 目录下运行：
+
+    python -m benchmark generate --url sqlite:///bench.db --scale small
+    python -m benchmark run --url sqlite:///bench.db --clients 50 --duration 30
+    python -m benchmark run --url sqlite:///bench.db --async-url sqlite+aiosqlite:///bench.db --compare-async
+    python -m benchmark compare benchmark/results/旧.json benchmark/results/新.json
+
+数据规模见 datagen.SCALES，用户名为 stu<N> / tea<N> / edu<N> / sys<N>，密码统一为 DEFAULT_PASSWORD。
+"""
+
+import importlib.util
+import os
+from typing import Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_PASSWORD = "bench123"
+
+
+def load_backend():
+    """加载 backend/test.py（后端应用模块）。"""
+    spec = importlib.util.spec_from_file_location("backend_app", os.path.join(BACKEND_DIR, "test.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bind_backend(backend, url: str, async_url: Optional[str] = None) -> None:
+    """让后端应用使用 url 指向的数据库。
+
+    指定 async_url（同一个库的异步驱动地址）时，经 run_db_read 的只读接口改用异步引擎；
+    否则一律走线程池中的同步会话，不受环境变量 ASYNC_DATABASE_URL 影响。
+    """
+    backend.engine = backend._build_engine(url)
+    backend.SessionLocal.configure(bind=backend.engine)
+    backend.async_engine, backend.AsyncSessionLocal = backend._build_async_engine(async_url) if async_url else (None, None)
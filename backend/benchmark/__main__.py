@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试命令行入口（在 backend 目录下执行 python -m benchmark ...）
+
+    generate  生成合成数据
+    run       并发执行用户操作路径，结果写入 benchmark/results/<时间>-<提交>.json；
+              加 --async-url ... --compare-async 对比同步与异步数据库访问
+    compare   对比两次结果中各接口的延迟与吞吐量
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import create_engine, func, select
+
+from . import BACKEND_DIR, RESULTS_DIR, bind_backend, load_backend
+from .datagen import SCALES, generate
+from .journeys import JOURNEY_WEIGHTS, run_clients
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=BACKEND_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def dataset_counts(backend, url: str) -> Dict[str, int]:
+    """从数据库中读取各角色用户数及主要表的行数，路径按这些数量挑选用户。"""
+    engine = create_engine(url)
+    try:
+        with engine.connect() as conn:
+            users = backend.User.__table__
+            roles = dict(conn.execute(select(users.c.role, func.count()).group_by(users.c.role)).all())
+            counts = {
+                "students": roles.get("student", 0),
+                "teachers": roles.get("teacher", 0),
+                "edu_admins": roles.get("edu_admin", 0),
+                "sys_admins": roles.get("sys_admin", 0),
+            }
+            for model in (backend.Course, backend.Enrollment, backend.Grade, backend.Log):
+                counts[model.__tablename__.lower()] = conn.execute(select(func.count()).select_from(model.__table__)).scalar()
+            return counts
+    finally:
+        engine.dispose()
+
+
+def _parse_weights(text: Optional[str]) -> Dict[str, int]:
+    if not text:
+        return dict(JOURNEY_WEIGHTS)
+    weights = {name: 0 for name in JOURNEY_WEIGHTS}
+    for part in text.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() not in weights:
+            raise SystemExit(f"未知的路径: {name}（可选 {', '.join(JOURNEY_WEIGHTS)}）")
+        weights[name.strip()] = int(value)
+    return weights
+
+
+async def _run(args, backend, dataset: Dict[str, int]) -> Dict[str, Any]:
+    import httpx
+
+    weights = _parse_weights(args.weights)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout,
+                                   limits=httpx.Limits(max_connections=args.clients))
+    else:
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=backend.app), base_url="http://bench", timeout=args.timeout)
+    try:
+        async with client:
+            return await run_clients(client, dataset, args.clients, args.duration, args.iterations,
+                                     think_ms=args.think_ms, seed=args.seed, weights=weights)
+    finally:
+        # 异步引擎的连接属于本次事件循环，循环结束前释放
+        if not args.base_url and backend.async_engine is not None:
+            await backend.async_engine.dispose()
+
+
+def cmd_generate(args) -> None:
+    backend = load_backend()
+    print(f"生成 {args.scale} 规模数据 -> {args.url}")
+    started = time.perf_counter()
+    counts = generate(backend, args.url, args.scale, seed=args.seed, chunk_size=args.chunk_size, drop=args.drop)
+    print(json.dumps({"scale": args.scale, "elapsed_s": round(time.perf_counter() - started, 1), "rows": counts}, ensure_ascii=False))
+
+
+def _run_once(args, backend, dataset: Dict[str, int], async_url: Optional[str], mode: str) -> str:
+    """执行一轮压测并保存结果，返回结果文件路径。mode 非空时作为标签和文件名后缀。"""
+    if not args.base_url:
+        bind_backend(backend, args.url, async_url)
+    started_at = datetime.utcnow()
+    result = asyncio.run(_run(args, backend, dataset))
+
+    commit = _git("rev-parse", "--short", "HEAD")
+    label = " ".join(part for part in (args.label, mode) if part) or None
+    output = {
+        "meta": {
+            "label": label,
+            "commit": commit,
+            "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+            "started_at": started_at.isoformat() + "Z",
+            "database": create_engine(args.url).dialect.name,
+            "target": args.base_url or "in-process",
+            "db_access": None if args.base_url else ("async" if async_url else "sync"),
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "iterations": args.iterations,
+            "think_ms": args.think_ms,
+            "weights": _parse_weights(args.weights),
+            "dataset": dataset,
+            "python": platform.python_version(),
+        },
+        **result,
+    }
+    suffix = f"-{mode}" if mode else ""
+    if args.output:
+        root, ext = os.path.splitext(args.output)
+        path = f"{root}{suffix}{ext or '.json'}"
+    else:
+        path = os.path.join(RESULTS_DIR, f"{started_at:%Y%m%d-%H%M%S}-{commit or 'nocommit'}{suffix}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+    if mode:
+        print(f"== {mode} ==")
+    print(f"{'接口':<52}{'请求数':>8}{'错误':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+    for endpoint, s in output["endpoints"].items():
+        print(f"{endpoint:<54}{s['count']:>8}{s['errors']:>6}{s.get('p50_ms', '-'):>10}{s.get('p95_ms', '-'):>10}{s.get('p99_ms', '-'):>10}")
+    total = output["summary"]
+    print(f"合计 {total['count']} 个请求，{total['errors']} 个错误，吞吐 {total.get('throughput_rps')} req/s，"
+          f"p50 {total.get('p50_ms')}ms / p95 {total.get('p95_ms')}ms / p99 {total.get('p99_ms')}ms")
+    print(f"结果已保存: {path}")
+    return path
+
+
+def cmd_run(args) -> None:
+    if args.base_url and (args.async_url or args.compare_async):
+        raise SystemExit("--async-url / --compare-async 只用于进程内运行，不能与 --base-url 同时使用")
+    if args.compare_async and not args.async_url:
+        raise SystemExit("--compare-async 需要同时指定 --async-url")
+
+    backend = load_backend()
+    dataset = dataset_counts(backend, args.url)
+    if not dataset["students"]:
+        raise SystemExit("数据库中没有学生用户，请先运行 python -m benchmark generate")
+
+    try:
+        if args.compare_async:
+            # 同一份数据、同一组路径先后以同步和异步两种数据库访问方式各跑一轮
+            sync_path = _run_once(args, backend, dataset, None, "sync")
+            async_path = _run_once(args, backend, dataset, args.async_url, "async")
+        else:
+            _run_once(args, backend, dataset, args.async_url, "")
+    finally:
+        if not args.base_url:
+            backend.audit_log_writer.stop()
+
+    if args.compare_async:
+        cmd_compare(argparse.Namespace(old=sync_path, new=async_path))
+
+
+def _change(old, new) -> str:
+    if old in (None, 0) or new is None:
+        return ""
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def cmd_compare(args) -> None:
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"旧: {old['meta'].get('label') or old['meta'].get('commit')} ({old['meta']['started_at']})  "
+          f"新: {new['meta'].get('label') or new['meta'].get('commit')} ({new['meta']['started_at']})")
+    if old["meta"].get("dataset") != new["meta"].get("dataset"):
+        print("注意：两次运行的数据规模不同")
+    print(f"{'接口':<52}{'p50 旧→新(ms)':>22}{'p95 旧→新(ms)':>24}{'p99 旧→新(ms)':>24}")
+    for label in sorted(set(old["endpoints"]) | set(new["endpoints"])):
+        o, n = old["endpoints"].get(label, {}), new["endpoints"].get(label, {})
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            cells.append(f"{o.get(key, '-')}→{n.get(key, '-')} {_change(o.get(key), n.get(key))}")
+        print(f"{label:<54}{cells[0]:>22}{cells[1]:>24}{cells[2]:>24}")
+    o, n = old["summary"], new["summary"]
+    print(f"吞吐: {o.get('throughput_rps')} → {n.get('throughput_rps')} req/s {_change(o.get('throughput_rps'), n.get('throughput_rps'))}")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmark", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("generate", help="生成合成数据")
+    p.add_argument("--url", required=True, help="数据库地址，如 sqlite:///bench.db 或 mysql+pymysql://...")
+    p.add_argument("--scale", choices=sorted(SCALES), default="small")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--chunk-size", type=int, default=10_000, help="每批插入的行数")
+    p.add_argument("--drop", action="store_true", help="先删除库中全部表")
+    p.set_defaults(func=cmd_generate)
+
+    p = sub.add_parser("run", help="并发执行用户操作路径")
+    p.add_argument("--url", required=True, help="数据库地址（进程内运行时后端连接此库；指定 --base-url 时仅用于读取用户数）")
+    p.add_argument("--base-url", help="压测已启动的服务，如 http://127.0.0.1:8000；默认在进程内直接调用应用")
+    p.add_argument("--clients", type=int, default=20, help="并发虚拟用户数")
+    p.add_argument("--duration", type=float, default=30, help="持续秒数")
+    p.add_argument("--iterations", type=int, help="每个虚拟用户执行的路径数（指定后不受 --duration 限制）")
+    p.add_argument("--think-ms", type=float, default=0, help="两次路径之间的平均停顿（毫秒，指数分布）")
+    p.add_argument("--weights", help="路径权重，如 student=70,teacher=20,edu_admin=7,sys_admin=3")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--timeout", type=float, default=60)
+    p.add_argument("--label", help="写入结果的备注")
+    p.add_argument("--output", help="结果文件路径（--compare-async 时分别加 -sync / -async 后缀）")
+    p.add_argument("--async-url", help="同一个库的异步驱动地址，如 sqlite+aiosqlite:///bench.db；指定后只读接口走异步引擎")
+    p.add_argument("--compare-async", action="store_true", help="先后以同步、异步方式各跑一轮并对比（需 --async-url）")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("compare", help="对比两次结果")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    if args.command == "run" and args.iterations:
+        args.duration = None
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
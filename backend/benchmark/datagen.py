@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+合成数据生成
+
+按规模预设直接批量写入数据库（每批 chunk_size 行的 executemany），不经过接口：
+用户与学生/教师档案、班级、教室、课程与授课安排、课表、成绩组成项、选课、成绩、
+总评成绩（EnrollmentScores）以及日志和日志日统计（LogDailyStats）。
+同一 seed 生成的数据完全相同，不同提交的基准结果可以直接对比。
+"""
+
+import random
+import time
+from collections import Counter
+from datetime import datetime, time as dt_time, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+
+from sqlalchemy import create_engine, event, func, select
+
+from . import DEFAULT_PASSWORD
+
+# students: 学生数, teachers: 教师数, courses: 课程数, enrollments: 每名学生的选课门数,
+# grade_items: 每门课程的成绩组成项数（1-3）, logs: 日志条数
+SCALES: Dict[str, Dict[str, int]] = {
+    "tiny": {"students": 200, "teachers": 10, "courses": 20, "enrollments": 4, "grade_items": 2, "logs": 2_000},
+    "small": {"students": 2_000, "teachers": 100, "courses": 200, "enrollments": 6, "grade_items": 2, "logs": 50_000},
+    "medium": {"students": 10_000, "teachers": 400, "courses": 800, "enrollments": 8, "grade_items": 2, "logs": 500_000},
+    # 5 万学生、3 千门课程、100 万条成绩、500 万条日志
+    "university": {"students": 50_000, "teachers": 1_500, "courses": 3_000, "enrollments": 10, "grade_items": 2, "logs": 5_000_000},
+}
+
+EDU_ADMINS = 5
+SYS_ADMINS = 2
+STUDENTS_PER_CLASS = 40
+CLASSROOMS = 200
+SEMESTER = "2025-2026-1"
+GRADE_ITEM_WEIGHTS = {1: [("期末", 1.0)], 2: [("期中", 0.4), ("期末", 0.6)], 3: [("平时", 0.2), ("期中", 0.3), ("期末", 0.5)]}
+DEPARTMENTS = ["计算机学院", "数学学院", "物理学院", "外国语学院", "经济管理学院", "机械工程学院"]
+LOG_ACTIONS = ["USER_LOGIN", "GET /api/v1/courses", "PUT /api/v1/grades", "POST /api/v1/enrollments", "USER_LOGOUT", "POST /api/v1/grades/approve"]
+LOG_DAYS = 180
+
+
+def _chunks(rows: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate(backend, url: str, scale: str = "small", seed: int = 42, chunk_size: int = 10_000,
+             drop: bool = False, progress: Callable[[str], None] = print) -> Dict[str, int]:
+    """在 url 指向的数据库中生成 scale 规模的数据，返回各表行数。
+
+    目标库需为空库（或指定 drop=True 先删除全部表）；表结构由 ORM 模型创建。
+    """
+    params = SCALES[scale]
+    rng = random.Random(seed)
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def _fast_sqlite(dbapi_connection, connection_record):
+            # 只用于导入：关闭同步写盘，导入中断时重新生成即可
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.close()
+
+    if drop:
+        backend.Base.metadata.drop_all(engine)
+    backend.Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(backend.User.__table__)).scalar():
+            raise SystemExit("目标数据库中已有用户数据，请使用空库或加 --drop")
+
+    counts: Dict[str, int] = {}
+
+    def insert(model, rows: Iterable[Dict[str, Any]]) -> None:
+        table = model.__table__
+        started = time.perf_counter()
+        n = 0
+        for batch in _chunks(rows, chunk_size):
+            with engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+            n += len(batch)
+        counts[table.name] = counts.get(table.name, 0) + n
+        progress(f"  {table.name:<20}{n:>10} 行  {time.perf_counter() - started:7.1f}s")
+
+    students, teachers, courses = params["students"], params["teachers"], params["courses"]
+    per_student, items_per_course = params["enrollments"], params["grade_items"]
+    weights = GRADE_ITEM_WEIGHTS[items_per_course]
+    pw = backend.hash_password(DEFAULT_PASSWORD)
+    now = datetime.utcnow()
+    first_teacher_user = students + 1
+    first_admin_user = students + teachers + 1
+
+    def users():
+        for i in range(1, students + 1):
+            yield {"id": i, "username": f"stu{i}", "password_hash": pw, "role": "student", "email": f"stu{i}@bench.local",
+                   "status": "active", "created_at": now, "updated_at": now, "is_deleted": False}
+        for j in range(1, teachers + 1):
+            uid = students + j
+            yield {"id": uid, "username": f"tea{j}", "password_hash": pw, "role": "teacher", "email": f"tea{j}@bench.local",
+                   "status": "active", "created_at": now, "updated_at": now, "is_deleted": False}
+        for k, (role, prefix, n) in enumerate([("edu_admin", "edu", EDU_ADMINS), ("sys_admin", "sys", SYS_ADMINS)]):
+            for a in range(1, n + 1):
+                uid = first_admin_user + k * EDU_ADMINS + a - 1
+                yield {"id": uid, "username": f"{prefix}{a}", "password_hash": pw, "role": role, "email": f"{prefix}{a}@bench.local",
+                       "status": "active", "created_at": now, "updated_at": now, "is_deleted": False}
+
+    class_count = -(-students // STUDENTS_PER_CLASS)
+    insert(backend.User, users())
+    insert(backend.Class, ({"id": c, "class_name": f"{DEPARTMENTS[c % len(DEPARTMENTS)]}{2022 + c % 4}级{c}班",
+                            "department": DEPARTMENTS[c % len(DEPARTMENTS)], "enrollment_year": 2022 + c % 4, "is_deleted": False}
+                           for c in range(1, class_count + 1)))
+    insert(backend.StudentProfile, ({"id": i, "user_id": i, "student_id_number": f"S{i:07d}", "full_name": f"学生{i}",
+                                     "class_id": (i - 1) // STUDENTS_PER_CLASS + 1} for i in range(1, students + 1)))
+    insert(backend.TeacherProfile, ({"id": j, "user_id": first_teacher_user + j - 1, "teacher_id_number": f"T{j:05d}",
+                                     "full_name": f"教师{j}", "title": ("讲师", "副教授", "教授")[j % 3]} for j in range(1, teachers + 1)))
+    insert(backend.Classroom, ({"id": r, "name": f"教{r // 50 + 1}-{r:03d}", "location": f"教学楼{r // 50 + 1}", "capacity": 60 + r % 4 * 40}
+                               for r in range(1, CLASSROOMS + 1)))
+    insert(backend.Course, ({"id": c, "course_code": f"BC{c:05d}", "course_name": f"课程{c}", "credits": 1 + c % 4,
+                             "description": f"课程{c}的简介", "department": DEPARTMENTS[c % len(DEPARTMENTS)],
+                             "is_deleted": 0, "grade_approved": False} for c in range(1, courses + 1)))
+    insert(backend.TeachingAssignment, ({"id": c, "teacher_id": (c - 1) % teachers + 1, "course_id": c, "semester": SEMESTER,
+                                         "is_deleted": 0} for c in range(1, courses + 1)))
+    days = ["Mon", "Tue", "Wed", "Thu", "Fri"]
+    insert(backend.CourseSchedule, ({"id": c, "teaching_id": c, "classroom_id": (c - 1) % CLASSROOMS + 1, "day_of_week": days[c % 5],
+                                     "start_time": dt_time(8 + c % 5 * 2, 0), "end_time": dt_time(9 + c % 5 * 2, 40)}
+                                    for c in range(1, courses + 1)))
+    insert(backend.GradeItem, ({"id": (c - 1) * items_per_course + k + 1, "course_id": c, "item_name": name, "weight": weight,
+                                "is_deleted": False} for c in range(1, courses + 1) for k, (name, weight) in enumerate(weights)))
+
+    enrollment_courses = [None] + [rng.sample(range(1, courses + 1), min(per_student, courses)) for _ in range(students)]
+    insert(backend.Enrollment, ({"id": (s - 1) * per_student + k + 1, "student_id": s, "course_id": c, "semester": SEMESTER,
+                                 "enrollment_date": now, "is_deleted": False}
+                                for s in range(1, students + 1) for k, c in enumerate(enrollment_courses[s])))
+
+    def grades():
+        gid = 0
+        for s in range(1, students + 1):
+            for k, c in enumerate(enrollment_courses[s]):
+                eid = (s - 1) * per_student + k + 1
+                for m in range(items_per_course):
+                    gid += 1
+                    # 每 4 门课中有一门全部评完，可供教学管理员审核；其余约 5% 未评分
+                    if c % 4 != 0 and rng.random() < 0.05:
+                        score, grade_status, graded_at = None, "pending", None
+                    else:
+                        score, grade_status, graded_at = round(rng.gauss(78, 10), 1), "graded", now
+                        score = min(100.0, max(0.0, score))
+                    yield {"id": gid, "enrollment_id": eid, "grade_item_id": (c - 1) * items_per_course + m + 1, "score": score,
+                           "status": grade_status, "graded_at": graded_at, "grader_id": first_teacher_user + (c - 1) % teachers,
+                           "is_deleted": False}
+
+    insert(backend.Grade, grades())
+
+    started = time.perf_counter()
+    session = backend.SessionLocal(bind=engine)
+    try:
+        counts["EnrollmentScores"] = backend.refresh_enrollment_scores(session)
+        session.commit()
+    finally:
+        session.close()
+    progress(f"  {'EnrollmentScores':<20}{counts['EnrollmentScores']:>10} 行  {time.perf_counter() - started:7.1f}s")
+
+    daily = Counter()
+    all_users = first_admin_user + EDU_ADMINS + SYS_ADMINS - 1
+
+    def logs():
+        for i in range(1, params["logs"] + 1):
+            created_at = now - timedelta(seconds=rng.random() * LOG_DAYS * 86400)
+            action = LOG_ACTIONS[int(rng.paretovariate(1.2)) % len(LOG_ACTIONS)]
+            daily[(created_at.date(), action)] += 1
+            yield {"id": i, "user_id": rng.randint(1, all_users), "action": action, "description": f"合成日志 {i}",
+                   "details": "{}", "ip_address": f"10.{i % 256}.{i // 256 % 256}.{rng.randint(1, 254)}", "created_at": created_at}
+
+    insert(backend.Log, logs())
+    insert(backend.LogDailyStat, ({"stat_date": d, "action": a, "log_count": n} for (d, a), n in sorted(daily.items())))
+    engine.dispose()
+    return counts
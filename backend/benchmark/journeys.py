@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+用户操作路径与延迟统计
+
+每条路径模拟一个用户从登录开始的一次完整操作，后续请求用到的 ID 从前面接口的返回中取得：
+
+- student: 登录 → 首页 → 已选课程 → 成绩汇总 → 某门课程的成绩 → 课程目录
+- teacher: 登录 → 授课列表 → 成绩册 → 修改一条成绩
+- edu_admin: 登录 → 待审核成绩 → 审核通过一门课程 → 可发布列表 → 发布
+- sys_admin: 登录 → 日志查询 → 日志统计 → 下一页日志（游标）
+"""
+
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from . import DEFAULT_PASSWORD
+
+# 各路径被选中的权重
+JOURNEY_WEIGHTS = {"student": 70, "teacher": 20, "edu_admin": 7, "sys_admin": 3}
+
+
+class JourneyFailed(Exception):
+    """路径中某一步失败，本次路径的剩余步骤不再执行。"""
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    if not latencies:
+        return {"count": 0, "errors": errors}
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(statistics.fmean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+
+class Recorder:
+    """按接口（方法 + 路由模板）和路径记录延迟。"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, List[float]] = {}
+        self.endpoint_errors: Dict[str, int] = {}
+        self.journeys: Dict[str, List[float]] = {}
+        self.journey_errors: Dict[str, int] = {}
+
+    async def call(self, client, method: str, template: str, path: str, expect=(200,), **kwargs):
+        label = f"{method} {template}"
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+        except Exception as exc:
+            self.endpoint_errors[label] = self.endpoint_errors.get(label, 0) + 1
+            raise JourneyFailed(f"{label}: {exc!r}")
+        self.endpoints.setdefault(label, []).append((time.perf_counter() - started) * 1000)
+        if response.status_code not in expect:
+            self.endpoint_errors[label] = self.endpoint_errors.get(label, 0) + 1
+            raise JourneyFailed(f"{label}: HTTP {response.status_code}")
+        return response
+
+    def journey_done(self, name: str, duration_ms: float, ok: bool) -> None:
+        if ok:
+            self.journeys.setdefault(name, []).append(duration_ms)
+        else:
+            self.journey_errors[name] = self.journey_errors.get(name, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        all_latencies = [v for values in self.endpoints.values() for v in values]
+        return {
+            "summary": summarize(all_latencies, sum(self.endpoint_errors.values()), elapsed),
+            "endpoints": {
+                label: summarize(self.endpoints.get(label, []), self.endpoint_errors.get(label, 0), elapsed)
+                for label in sorted(set(self.endpoints) | set(self.endpoint_errors))
+            },
+            "journeys": {
+                name: summarize(self.journeys.get(name, []), self.journey_errors.get(name, 0), elapsed)
+                for name in sorted(set(self.journeys) | set(self.journey_errors))
+            },
+        }
+
+
+async def _login(rec: Recorder, client, username: str) -> Dict[str, str]:
+    r = await rec.call(client, "POST", "/api/v1/auth/login", "/api/v1/auth/login",
+                       json={"username": username, "password": DEFAULT_PASSWORD})
+    return {"Authorization": f"Bearer {r.json()['token']}"}
+
+
+async def student_journey(rec: Recorder, client, rng: random.Random, dataset: Dict[str, int]) -> None:
+    h = await _login(rec, client, f"stu{rng.randint(1, dataset['students'])}")
+    await rec.call(client, "GET", "/api/v1/me/dashboard", "/api/v1/me/dashboard", headers=h)
+    enrollments = (await rec.call(client, "GET", "/api/v1/me/enrollments", "/api/v1/me/enrollments", headers=h)).json()
+    await rec.call(client, "GET", "/api/v1/me/grades/summary", "/api/v1/me/grades/summary", headers=h)
+    if enrollments:
+        eid = rng.choice(enrollments)["enrollment_id"]
+        await rec.call(client, "GET", "/api/v1/me/enrollments/{enrollment_id}/grades", f"/api/v1/me/enrollments/{eid}/grades", headers=h)
+    await rec.call(client, "GET", "/api/v1/courses", "/api/v1/courses", headers=h, params={"page": rng.randint(1, 5)})
+
+
+async def teacher_journey(rec: Recorder, client, rng: random.Random, dataset: Dict[str, int]) -> None:
+    h = await _login(rec, client, f"tea{rng.randint(1, dataset['teachers'])}")
+    assignments = (await rec.call(client, "GET", "/api/v1/me/teaching-assignments", "/api/v1/me/teaching-assignments", headers=h)).json()
+    if not assignments:
+        return
+    course_id = rng.choice(assignments)["course"]["id"]
+    gradebook = (await rec.call(client, "GET", "/api/v1/courses/{course_id}/grades", f"/api/v1/courses/{course_id}/grades", headers=h)).json()
+    grade_ids = [g["grade_id"] for s in gradebook.get("students", []) for g in s["grades"].values() if g.get("grade_id")]
+    if grade_ids:
+        await rec.call(client, "PUT", "/api/v1/grades/{grade_id}", f"/api/v1/grades/{rng.choice(grade_ids)}", headers=h,
+                       json={"score": round(rng.uniform(60, 100), 1)})
+
+
+async def edu_admin_journey(rec: Recorder, client, rng: random.Random, dataset: Dict[str, int]) -> None:
+    h = await _login(rec, client, f"edu{rng.randint(1, dataset['edu_admins'])}")
+    pending = (await rec.call(client, "GET", "/api/v1/grades/pending-review", "/api/v1/grades/pending-review", headers=h)).json()
+    candidates = [c["course_id"] for c in pending if c["status"] == "pending_review"]
+    if candidates:
+        # 并发的管理员可能同时审核同一门课程，重复审核返回 400 属于正常情况
+        await rec.call(client, "POST", "/api/v1/grades/approve", "/api/v1/grades/approve", headers=h,
+                       json={"course_id": rng.choice(candidates)}, expect=(200, 400))
+    publishable = (await rec.call(client, "GET", "/api/v1/grades/publish-list", "/api/v1/grades/publish-list", headers=h)).json()
+    approved = [c["course_id"] for c in publishable if c["status"] == "approved"]
+    if approved:
+        await rec.call(client, "POST", "/api/v1/grades/publish", "/api/v1/grades/publish", headers=h,
+                       json={"course_ids": [rng.choice(approved)]})
+
+
+async def sys_admin_journey(rec: Recorder, client, rng: random.Random, dataset: Dict[str, int]) -> None:
+    h = await _login(rec, client, f"sys{rng.randint(1, dataset['sys_admins'])}")
+    first = (await rec.call(client, "GET", "/api/v1/logs", "/api/v1/logs", headers=h, params={"cursor": "", "pageSize": 20})).json()
+    await rec.call(client, "GET", "/api/v1/logs/stats", "/api/v1/logs/stats", headers=h)
+    cursor = first.get("pagination", {}).get("nextCursor")
+    if cursor:
+        await rec.call(client, "GET", "/api/v1/logs", "/api/v1/logs", headers=h, params={"cursor": cursor, "pageSize": 20})
+
+
+JOURNEYS = {
+    "student": student_journey,
+    "teacher": teacher_journey,
+    "edu_admin": edu_admin_journey,
+    "sys_admin": sys_admin_journey,
+}
+
+
+async def run_clients(client, dataset: Dict[str, int], clients: int, duration: Optional[float], iterations: Optional[int],
+                      think_ms: float = 0, seed: int = 1, weights: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """clients 个并发虚拟用户反复按权重挑选路径执行，直到 duration 秒或每人 iterations 次。"""
+    weights = weights or JOURNEY_WEIGHTS
+    names = [name for name in weights if weights[name] > 0]
+    rec = Recorder()
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def worker(idx: int):
+        rng = random.Random(seed * 100_003 + idx)
+        n = 0
+        while (iterations is None or n < iterations) and (deadline is None or time.perf_counter() < deadline):
+            n += 1
+            name = rng.choices(names, weights=[weights[x] for x in names])[0]
+            journey_started = time.perf_counter()
+            try:
+                await JOURNEYS[name](rec, client, rng, dataset)
+                ok = True
+            except JourneyFailed:
+                ok = False
+            rec.journey_done(name, (time.perf_counter() - journey_started) * 1000, ok)
+            if think_ms:
+                await asyncio.sleep(rng.expovariate(1 / think_ms) / 1000)
+
+    await asyncio.gather(*(worker(i) for i in range(clients)))
+    elapsed = time.perf_counter() - started
+    return {"elapsed_s": round(elapsed, 3), **rec.report(elapsed)}
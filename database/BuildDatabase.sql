@@ -8,12 +8,16 @@ USE `Web-Programming-Course-Project`;
 SET FOREIGN_KEY_CHECKS = 0;
 
 -- 先删除所有表（如存在）
+DROP TABLE IF EXISTS `LoginAttempts`;
+DROP TABLE IF EXISTS `UserSessions`;
+DROP TABLE IF EXISTS `LogDailyStats`;
 DROP TABLE IF EXISTS `Logs`;
 DROP TABLE IF EXISTS `CourseSchedules`;
 DROP TABLE IF EXISTS `Classrooms`;
 DROP TABLE IF EXISTS `AssignmentSubmissions`;
 DROP TABLE IF EXISTS `Assignments`;
 DROP TABLE IF EXISTS `TaskProgress`;
+DROP TABLE IF EXISTS `EnrollmentScores`;
 DROP TABLE IF EXISTS `Grades`;
 DROP TABLE IF EXISTS `GradeItems`;
 DROP TABLE IF EXISTS `Enrollments`;
@@ -123,6 +127,9 @@ CREATE TABLE `CourseMaterials` (
   `material_type` ENUM('document','video','carousel_image','config') NOT NULL,
   `title` VARCHAR(255),
   `file_path_or_content` VARCHAR(255),
+  `file_hash` CHAR(64),
+  `file_size` INT,
+  `content_type` VARCHAR(100),
   `display_order` INT DEFAULT 0,
   `uploaded_by` INT,
   `created_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -209,6 +216,16 @@ CREATE INDEX idx_grades_grade_item_id ON `Grades`(`grade_item_id`);
 CREATE INDEX idx_grades_grader_id ON `Grades`(`grader_id`);
 CREATE INDEX idx_grades_enroll_gradeitem ON `Grades`(`enrollment_id`, `grade_item_id`);
 
+-- 每条选课记录的总评成绩（由 Grades / GradeItems 派生，后端写成绩时增量维护）
+CREATE TABLE `EnrollmentScores` (
+  `enrollment_id` INT PRIMARY KEY,
+  `final_score` DECIMAL(6,2) NOT NULL DEFAULT 0,
+  `graded_item_count` INT NOT NULL DEFAULT 0,
+  `gpa_points` DECIMAL(3,1) NOT NULL DEFAULT 0,
+  `last_updated` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (`enrollment_id`) REFERENCES `Enrollments`(`id`)
+);
+
 CREATE TABLE `TaskProgress` (
   `id` INT PRIMARY KEY AUTO_INCREMENT,
   `enrollment_id` INT NOT NULL,
@@ -227,6 +244,7 @@ CREATE TABLE `AssignmentSubmissions` (
   `assignment_id` INT NOT NULL,
   `student_id` INT NOT NULL,
   `file_path` VARCHAR(255),
+  `file_hash` CHAR(64),
   `submitted_at` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
   `score` DECIMAL(5,2),
   `feedback` TEXT,
@@ -240,6 +258,7 @@ CREATE TABLE `AssignmentSubmissions` (
 CREATE INDEX idx_asnsub_assignment_id ON `AssignmentSubmissions`(`assignment_id`);
 CREATE INDEX idx_asnsub_student_id ON `AssignmentSubmissions`(`student_id`);
 CREATE INDEX idx_asnsub_assignment_student ON `AssignmentSubmissions`(`assignment_id`, `student_id`);
+CREATE INDEX idx_asnsub_student_assignment_time ON `AssignmentSubmissions`(`student_id`, `assignment_id`, `submitted_at`);
 
 CREATE TABLE `Logs` (
   `id` INT PRIMARY KEY AUTO_INCREMENT,
@@ -253,6 +272,37 @@ CREATE TABLE `Logs` (
 );
 CREATE INDEX idx_logs_user_id ON `Logs`(`user_id`);
 CREATE INDEX idx_logs_ip_address ON `Logs`(`ip_address`);
+CREATE INDEX idx_logs_created_at ON `Logs`(`created_at`);
+CREATE INDEX idx_logs_user_created ON `Logs`(`user_id`, `created_at`);
+CREATE INDEX idx_logs_action_created ON `Logs`(`action`, `created_at`);
+
+-- 按 (日期, 操作类型) 汇总的日志条数，后端写入日志时同步累加，供 /api/v1/logs/stats 使用
+CREATE TABLE `LogDailyStats` (
+  `stat_date` DATE NOT NULL,
+  `action` VARCHAR(255) NOT NULL,
+  `log_count` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`stat_date`, `action`)
+);
+
+-- 登录会话（SESSION_STORE=database 时由多个后端进程共享）
+CREATE TABLE `UserSessions` (
+  `token` VARCHAR(64) PRIMARY KEY,
+  `user_id` INT NOT NULL,
+  `username` VARCHAR(50) NOT NULL,
+  `role` VARCHAR(20) NOT NULL,
+  `student_profile_id` INT,
+  `teacher_profile_id` INT,
+  `created_at` DATETIME DEFAULT CURRENT_TIMESTAMP,
+  `expires_at` DATETIME NOT NULL
+);
+CREATE INDEX idx_sessions_user_id ON `UserSessions`(`user_id`);
+CREATE INDEX idx_sessions_expires_at ON `UserSessions`(`expires_at`);
+
+CREATE TABLE `LoginAttempts` (
+  `username` VARCHAR(50) PRIMARY KEY,
+  `failed_attempts` INT NOT NULL DEFAULT 0,
+  `locked_until` DATETIME
+);
 
 -- 所有表结构定义完毕。
 
@@ -347,6 +397,9 @@ INSERT INTO `CourseSchedules` (`teaching_id`, `classroom_id`, `day_of_week`, `st
 INSERT INTO `Logs` (`user_id`, `action`, `details`, `ip_address`) VALUES
 (1, 'USER_LOGIN', '登录成功', '127.0.0.1');
 
+INSERT INTO `LogDailyStats` (`stat_date`, `action`, `log_count`)
+SELECT DATE(`created_at`), `action`, COUNT(*) FROM `Logs` WHERE `created_at` IS NOT NULL GROUP BY DATE(`created_at`), `action`;
+
 
 SET FOREIGN_KEY_CHECKS = 1;
 
@@ -899,3 +952,30 @@ INSERT INTO `Grades` (`enrollment_id`, `grade_item_id`, `score`, `status`, `grad
   (73, 9, 75, 'graded', '2024-12-20', 109), (73, 10, 78, 'graded', '2024-12-20', 110),
   (74, 9, 90, 'graded', '2024-12-20', 111), (74, 10, 92, 'graded', '2024-12-20', 112),
   (75, 9, 85, 'graded', '2024-12-20', 113), (75, 10, 87, 'graded', '2024-12-20', 114);
+
+-- 根据已有成绩生成选课总评（绩点换算与后端 GPA_SCALE 一致）
+INSERT INTO `EnrollmentScores` (`enrollment_id`, `final_score`, `graded_item_count`, `gpa_points`)
+SELECT
+  t.`enrollment_id`,
+  ROUND(t.`total`, 2),
+  t.`graded`,
+  CASE
+    WHEN t.`total` >= 90 THEN 4.0
+    WHEN t.`total` >= 85 THEN 3.7
+    WHEN t.`total` >= 80 THEN 3.3
+    WHEN t.`total` >= 75 THEN 3.0
+    WHEN t.`total` >= 70 THEN 2.7
+    WHEN t.`total` >= 65 THEN 2.3
+    WHEN t.`total` >= 60 THEN 2.0
+    ELSE 0
+  END
+FROM (
+  SELECT
+    e.`id` AS `enrollment_id`,
+    COALESCE(SUM(CASE WHEN g.`score` IS NOT NULL THEN g.`score` * gi.`weight` ELSE 0 END), 0) AS `total`,
+    COUNT(CASE WHEN g.`score` IS NOT NULL AND gi.`id` IS NOT NULL THEN 1 END) AS `graded`
+  FROM `Enrollments` e
+  LEFT JOIN `Grades` g ON g.`enrollment_id` = e.`id` AND g.`is_deleted` = 0
+  LEFT JOIN `GradeItems` gi ON gi.`id` = g.`grade_item_id` AND gi.`is_deleted` = 0
+  GROUP BY e.`id`
+) t;
@@ -0,0 +1,5 @@
+-- 为已有数据库补充上传文件的 SHA-256 列（新建库直接使用 BuildDatabase.sql 即可）
+USE `Web-Programming-Course-Project`;
+
+ALTER TABLE `CourseMaterials` ADD COLUMN `file_hash` CHAR(64) AFTER `file_path_or_content`;
+ALTER TABLE `AssignmentSubmissions` ADD COLUMN `file_hash` CHAR(64) AFTER `file_path`;
@@ -0,0 +1,6 @@
+-- 资料上传时记录文件大小与类型，列表接口不再逐个 stat 文件
+-- 执行后运行 `python test.py backfill-material-metadata` 为旧资料补齐大小
+USE `Web-Programming-Course-Project`;
+
+ALTER TABLE `CourseMaterials` ADD COLUMN `file_size` INT AFTER `file_hash`;
+ALTER TABLE `CourseMaterials` ADD COLUMN `content_type` VARCHAR(100) AFTER `file_size`;
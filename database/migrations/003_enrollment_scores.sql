@@ -0,0 +1,40 @@
+-- 新增选课总评物化表
+-- 之后如需修复数据，可运行 `python test.py rebuild-enrollment-scores` 全量重建
+USE `Web-Programming-Course-Project`;
+
+CREATE TABLE IF NOT EXISTS `EnrollmentScores` (
+  `enrollment_id` INT PRIMARY KEY,
+  `final_score` DECIMAL(6,2) NOT NULL DEFAULT 0,
+  `graded_item_count` INT NOT NULL DEFAULT 0,
+  `gpa_points` DECIMAL(3,1) NOT NULL DEFAULT 0,
+  `last_updated` TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  FOREIGN KEY (`enrollment_id`) REFERENCES `Enrollments`(`id`)
+);
+
+-- 根据已有成绩生成选课总评（绩点换算与后端 GPA_SCALE 一致）
+DELETE FROM `EnrollmentScores`;
+INSERT INTO `EnrollmentScores` (`enrollment_id`, `final_score`, `graded_item_count`, `gpa_points`)
+SELECT
+  t.`enrollment_id`,
+  ROUND(t.`total`, 2),
+  t.`graded`,
+  CASE
+    WHEN t.`total` >= 90 THEN 4.0
+    WHEN t.`total` >= 85 THEN 3.7
+    WHEN t.`total` >= 80 THEN 3.3
+    WHEN t.`total` >= 75 THEN 3.0
+    WHEN t.`total` >= 70 THEN 2.7
+    WHEN t.`total` >= 65 THEN 2.3
+    WHEN t.`total` >= 60 THEN 2.0
+    ELSE 0
+  END
+FROM (
+  SELECT
+    e.`id` AS `enrollment_id`,
+    COALESCE(SUM(CASE WHEN g.`score` IS NOT NULL THEN g.`score` * gi.`weight` ELSE 0 END), 0) AS `total`,
+    COUNT(CASE WHEN g.`score` IS NOT NULL AND gi.`id` IS NOT NULL THEN 1 END) AS `graded`
+  FROM `Enrollments` e
+  LEFT JOIN `Grades` g ON g.`enrollment_id` = e.`id` AND g.`is_deleted` = 0
+  LEFT JOIN `GradeItems` gi ON gi.`id` = g.`grade_item_id` AND gi.`is_deleted` = 0
+  GROUP BY e.`id`
+) t;
@@ -0,0 +1,4 @@
+-- 学生作业列表按 (学生, 作业) 取最近一次提交时使用
+USE `Web-Programming-Course-Project`;
+
+CREATE INDEX idx_asnsub_student_assignment_time ON `AssignmentSubmissions`(`student_id`, `assignment_id`, `submitted_at`);
@@ -0,0 +1,20 @@
+-- 日志查询索引与按天汇总表
+-- 时间范围查询和 ORDER BY created_at DESC 分页走 idx_logs_created_at；
+-- 按用户 / 操作类型筛选后的倒序分页分别走两个联合索引
+USE `Web-Programming-Course-Project`;
+
+CREATE INDEX idx_logs_created_at ON `Logs`(`created_at`);
+CREATE INDEX idx_logs_user_created ON `Logs`(`user_id`, `created_at`);
+CREATE INDEX idx_logs_action_created ON `Logs`(`action`, `created_at`);
+
+CREATE TABLE IF NOT EXISTS `LogDailyStats` (
+  `stat_date` DATE NOT NULL,
+  `action` VARCHAR(255) NOT NULL,
+  `log_count` INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (`stat_date`, `action`)
+);
+
+-- 根据已有日志生成汇总（之后由后端写入日志时增量累加）
+DELETE FROM `LogDailyStats`;
+INSERT INTO `LogDailyStats` (`stat_date`, `action`, `log_count`)
+SELECT DATE(`created_at`), `action`, COUNT(*) FROM `Logs` WHERE `created_at` IS NOT NULL GROUP BY DATE(`created_at`), `action`;